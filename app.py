@@ -3,34 +3,58 @@ Flask web application for pothole detection.
 """
 
 from flask import Flask, render_template, request, jsonify, send_from_directory, send_file
-from werkzeug.utils import secure_filename
 from pathlib import Path
 import os
+import sys
 import uuid
+import threading
+import atexit
+import time
+import torch
 from ultralytics import YOLO
 import cv2
 import numpy as np
-from PIL import Image
 import base64
-from io import BytesIO
 from depth_estimator import get_depth_estimator
-from report_generator import get_report_generator
+from frame_batcher import FrameBatcher, MAX_BATCH_SIZE
+from report_worker import ReportWorker
 from datetime import datetime
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _tj = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    # PyTurboJPEG or libjpeg-turbo not available; fall back to OpenCV
+    _tj = None
+
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['RESULTS_FOLDER'] = 'results'
+# Annotated results are returned inline as base64. Set SAVE_RESULTS to
+# also write them to RESULTS_FOLDER (served by the legacy /results route);
+# saved files are deleted after RESULTS_TTL_SECONDS.
+app.config['SAVE_RESULTS'] = False
+app.config['RESULTS_TTL_SECONDS'] = 60 * 60
 
 # Create necessary directories
 Path(app.config['UPLOAD_FOLDER']).mkdir(exist_ok=True)
 Path(app.config['RESULTS_FOLDER']).mkdir(exist_ok=True)
 
-# Load model (will be loaded on first request)
+# Load model (loaded and warmed up at startup)
 model = None
-MODEL_PATH = 'runs/detect/pothole_detector2/weights/best.pt'
+# Same run directory train.py (BEST_WEIGHTS) and detect.py write to
+MODEL_PATH = 'runs/detect/pothole_detector/weights/best.pt'
+# TensorRT engine exported next to the weights (preferred when present)
+ENGINE_PATH = str(Path(MODEL_PATH).with_suffix('.engine'))
+
+# Build reports in a persistent forked worker process (Linux only); it is
+# forked at startup before CUDA initializes. Otherwise reports are built
+# in the request thread.
+USE_REPORT_WORKER = sys.platform.startswith('linux')
+report_worker = None
 
-# Depth estimator (will be loaded on first request)
+# Depth estimator (loaded and warmed up at startup)
 depth_estimator = None
 # Enable depth estimation for local use
 USE_DEPTH_ESTIMATION = True
@@ -40,7 +64,11 @@ def load_model():
     global model
     if model is None:
         model_file = Path(MODEL_PATH)
-        if model_file.exists():
+        if Path(ENGINE_PATH).exists():
+            print(f"Loading TensorRT engine from {ENGINE_PATH}...")
+            model = YOLO(ENGINE_PATH, task='detect')
+            print("TensorRT engine loaded successfully!")
+        elif model_file.exists():
             print(f"Loading trained model from {MODEL_PATH}...")
             model = YOLO(MODEL_PATH)
             print("Trained model loaded successfully!")
@@ -52,20 +80,186 @@ def load_model():
             print("Pretrained model loaded successfully!")
     return model
 
-def detect_potholes_in_image(image_path):
+def load_depth_estimator():
+    """Load the MiDaS depth estimator if depth estimation is enabled."""
+    global depth_estimator
+    if USE_DEPTH_ESTIMATION and depth_estimator is None:
+        try:
+            print("Loading depth estimator...")
+            depth_estimator = get_depth_estimator()
+        except Exception as e:
+            print(f"Warning: Could not load depth estimator: {e}")
+            print("Continuing without severity classification.")
+    return depth_estimator
+
+def warmup_model():
+    """
+    Load the models and run dummy forward passes so the first request is not a cold start.
+    
+    YOLO is warmed up at batch size 1 and at the frame batcher's maximum
+    batch size so CUDA/TensorRT pick kernels for both shapes up front.
+    """
+    model = load_model()
+    for batch_size in (1, MAX_BATCH_SIZE):
+        dummy = [np.zeros((640, 640, 3), dtype=np.uint8)] * batch_size
+        model.predict(source=dummy, verbose=False)
+    
+    estimator = load_depth_estimator()
+    if estimator is not None:
+        estimator.estimate_depth(np.zeros((480, 640, 3), dtype=np.uint8))
+
+def _release_cuda_cache():
+    """Return cached GPU memory to the driver on shutdown."""
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+def get_report_generator():
+    """
+    Get the report generator, importing report_generator on first use.
+    
+    ReportLab and Pillow are only loaded once a report is requested, so
+    they stay out of worker startup time and memory.
+    """
+    from report_generator import get_report_generator as _factory
+    return _factory()
+
+def _flush_reports():
+    """Persist the directory entries of reports written this run."""
+    report_generator = sys.modules.get('report_generator')
+    if report_generator is not None and report_generator.get_report_generator.cache_info().currsize:
+        try:
+            report_generator.get_report_generator().flush()
+        except OSError as e:
+            print(f"Warning: Could not flush reports directory: {e}")
+
+def _cleanup_results_loop():
+    """Periodically delete saved result images older than RESULTS_TTL_SECONDS."""
+    results_dir = Path(app.config['RESULTS_FOLDER'])
+    ttl = app.config['RESULTS_TTL_SECONDS']
+    while True:
+        cutoff = time.time() - ttl
+        for entry in os.scandir(results_dir):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass  # Removed concurrently or still in use
+        time.sleep(min(ttl, 300))
+
+def _is_reloader_parent():
+    """True in the watcher process of the debug reloader, which never serves requests."""
+    return os.environ.get('FLASK_DEBUG') == '1' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
+if not _is_reloader_parent():
+    if USE_REPORT_WORKER:
+        try:
+            report_worker = ReportWorker()
+            report_worker.start()
+            atexit.register(report_worker.stop)
+        except Exception as e:
+            print(f"Warning: Report worker failed to start: {e}")
+            report_worker = None
+    try:
+        warmup_model()
+    except Exception as e:
+        print(f"Warning: Model warmup failed: {e}")
+    atexit.register(_release_cuda_cache)
+    atexit.register(_flush_reports)
+    if app.config['SAVE_RESULTS']:
+        threading.Thread(target=_cleanup_results_loop, name='results-cleanup', daemon=True).start()
+
+# Per-thread decode buffers reused across video frames
+_decode_buffers = threading.local()
+
+def decode_jpeg(jpeg_bytes, reuse_buffer=False):
+    """
+    Decode encoded image bytes into a BGR numpy array.
+    
+    Uses libjpeg-turbo when available, falling back to cv2.imdecode for
+    other formats or when PyTurboJPEG is not installed. EXIF orientation
+    is not applied, so this is meant for video frames, not photo uploads.
+    
+    Args:
+        jpeg_bytes: Encoded image bytes
+        reuse_buffer: Decode into a per-thread buffer that is overwritten
+            by the next call on the same thread. Only safe when the caller
+            is done with the frame before decoding another one.
+    
+    Returns:
+        numpy array (H, W, 3) or None if the bytes could not be decoded
+    """
+    if _tj is not None:
+        try:
+            if not reuse_buffer:
+                return _tj.decode(jpeg_bytes, pixel_format=TJPF_BGR)
+            width, height, _, _ = _tj.decode_header(jpeg_bytes)
+            buf = getattr(_decode_buffers, 'buf', None)
+            if buf is None or buf.shape != (height, width, 3):
+                buf = np.empty((height, width, 3), dtype=np.uint8)
+                _decode_buffers.buf = buf
+            return _tj.decode(jpeg_bytes, pixel_format=TJPF_BGR, dst=buf)
+        except OSError:
+            pass  # Not a JPEG libjpeg-turbo can handle
+    
+    nparr = np.frombuffer(jpeg_bytes, np.uint8)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+# Batches concurrent video frames into a single YOLO forward pass, with
+# MiDaS running on the same batch alongside it on GPU hosts
+frame_batcher = FrameBatcher(
+    load_model,
+    conf=0.30,  # Slightly higher threshold for video
+    iou=0.45,
+    depth_loader=load_depth_estimator
+)
+
+def boxes_to_detections(boxes):
+    """
+    Convert YOLO boxes to detection dicts.
+    
+    Coordinates, confidences and classes are each moved to the CPU in one
+    transfer instead of three small transfers per box.
+    """
+    xyxy = boxes.xyxy.cpu().numpy()
+    conf = boxes.conf.cpu().numpy()
+    cls = boxes.cls.cpu().numpy().astype(int)
+    return [
+        {
+            'bbox': xyxy[i].tolist(),  # [x1, y1, x2, y2]
+            'confidence': float(conf[i]),
+            'class': int(cls[i])
+        }
+        for i in range(len(boxes))
+    ]
+
+def add_severity(detections, estimator, depth_map, depth_scale):
+    """Add severity classification to detections from a precomputed depth map."""
+    for detection in detections:
+        try:
+            severity_info = estimator.score_bbox(depth_map, detection['bbox'], depth_scale)
+            detection['severity'] = severity_info['severity']
+            detection['depth_score'] = severity_info['depth_score']
+            detection['severity_color'] = severity_info['color']
+            detection['severity_emoji'] = severity_info['emoji']
+        except Exception as e:
+            print(f"Warning: Depth estimation failed for detection: {e}")
+            detection['severity'] = 'Unknown'
+
+def detect_potholes_in_image(image):
     """
     Run pothole detection on an image.
     
+    Args:
+        image: Decoded BGR image as numpy array (H, W, 3)
+    
     Returns:
         dict: Detection results with severity classification
     """
-    global depth_estimator
-    
     model = load_model()
     
     # Run inference
     results = model.predict(
-        source=image_path,
+        source=image,
         conf=0.25,  # Normal threshold for trained model
         iou=0.45,
         verbose=False
@@ -73,60 +267,47 @@ def detect_potholes_in_image(image_path):
     
     result = results[0]
     
-    # Load original image for depth estimation
-    original_img = cv2.imread(str(image_path))
-    
     # Get annotated image
     annotated_img = result.plot()
     
-    # Convert to PIL Image
-    annotated_img_rgb = cv2.cvtColor(annotated_img, cv2.COLOR_BGR2RGB)
-    pil_img = Image.fromarray(annotated_img_rgb)
+    # Encode annotated image in memory (OpenCV encodes BGR directly)
+    _, result_jpeg = cv2.imencode('.jpg', annotated_img, [cv2.IMWRITE_JPEG_QUALITY, 85])
     
-    # Save annotated image
-    result_filename = f"result_{uuid.uuid4().hex[:8]}.jpg"
-    result_path = Path(app.config['RESULTS_FOLDER']) / result_filename
-    pil_img.save(result_path)
+    # Optionally persist it for the legacy /results route
+    result_filename = None
+    if app.config['SAVE_RESULTS']:
+        result_filename = f"result_{uuid.uuid4().hex[:8]}.jpg"
+        result_path = Path(app.config['RESULTS_FOLDER']) / result_filename
+        result_path.write_bytes(result_jpeg.tobytes())
     
     # Get detection info
     boxes = result.boxes
-    detections = []
+    detections = boxes_to_detections(boxes)
     
     # Initialize depth estimator if enabled
-    if USE_DEPTH_ESTIMATION and depth_estimator is None:
+    depth_estimator = load_depth_estimator()
+    
+    # Estimate depth once per image and reuse it for every detection
+    depth_map = None
+    depth_scale = None
+    if USE_DEPTH_ESTIMATION and depth_estimator is not None and len(boxes) > 0:
         try:
-            print("Loading depth estimator...")
-            depth_estimator = get_depth_estimator()
+            depth_map, depth_scale = depth_estimator.estimate_depth(image)
         except Exception as e:
-            print(f"Warning: Could not load depth estimator: {e}")
-            print("Continuing without severity classification.")
+            print(f"Warning: Depth estimation failed for image: {e}")
     
-    for box in boxes:
-        bbox = box.xyxy[0].cpu().numpy().tolist()
-        detection = {
-            'confidence': float(box.conf[0]),
-            'class': int(box.cls[0]),
-            'bbox': bbox
-        }
-        
-        # Add severity classification if depth estimator is available
-        if USE_DEPTH_ESTIMATION and depth_estimator is not None:
-            try:
-                severity_info = depth_estimator.classify_pothole_severity(original_img, bbox)
-                detection['severity'] = severity_info['severity']
-                detection['depth_score'] = severity_info['depth_score']
-                detection['severity_color'] = severity_info['color']
-                detection['severity_emoji'] = severity_info['emoji']
-            except Exception as e:
-                print(f"Warning: Depth estimation failed for detection: {e}")
-                detection['severity'] = 'Unknown'
-        
-        detections.append(detection)
+    # Add severity classification if a depth map is available
+    if depth_map is not None:
+        add_severity(detections, depth_estimator, depth_map, depth_scale)
+    elif USE_DEPTH_ESTIMATION and depth_estimator is not None:
+        for detection in detections:
+            detection['severity'] = 'Unknown'
     
     return {
         'count': len(boxes),
         'detections': detections,
-        'result_image': result_filename
+        'result_image': result_filename,
+        'result_image_b64': base64.b64encode(result_jpeg).decode('ascii')
     }
 
 @app.route('/')
@@ -146,20 +327,26 @@ def detect():
         if file.filename == '':
             return jsonify({'error': 'No image selected'}), 400
         
-        # Save uploaded file
-        filename = secure_filename(f"{uuid.uuid4().hex[:8]}_{file.filename}")
-        filepath = Path(app.config['UPLOAD_FOLDER']) / filename
-        file.save(filepath)
+        # Decode the upload in memory (no disk roundtrip). cv2.imdecode
+        # applies EXIF orientation, which phone photos rely on; TurboJPEG
+        # does not, so it is kept for canvas video frames only.
+        image = cv2.imdecode(np.frombuffer(file.read(), np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return jsonify({'error': 'Could not decode image'}), 400
         
         # Run detection
-        results = detect_potholes_in_image(str(filepath))
+        results = detect_potholes_in_image(image)
         
-        return jsonify({
+        response = {
             'success': True,
             'count': results['count'],
             'detections': results['detections'],
-            'result_image': f'/results/{results["result_image"]}'
-        })
+            'result_image_b64': results['result_image_b64']
+        }
+        if results['result_image']:
+            response['result_image'] = f'/results/{results["result_image"]}'
+        
+        return jsonify(response)
     
     except Exception as e:
         print(f"Error during detection: {e}")
@@ -169,43 +356,40 @@ def detect():
 def detect_frame():
     """Handle real-time video frame detection."""
     try:
-        # Get base64 encoded frame from request
-        data = request.get_json()
-        if not data or 'frame' not in data:
-            return jsonify({'error': 'No frame provided'}), 400
-        
-        # Decode base64 image
-        import base64
-        frame_data = data['frame'].split(',')[1]  # Remove data:image/jpeg;base64, prefix
-        frame_bytes = base64.b64decode(frame_data)
+        if request.mimetype in ('image/jpeg', 'application/octet-stream'):
+            # Raw JPEG bytes as the request body (no base64 overhead)
+            frame_bytes = request.get_data()
+        elif 'frame' in request.files:
+            # Raw JPEG bytes sent as multipart upload
+            frame_bytes = request.files['frame'].read()
+        else:
+            # Get base64 encoded frame from request
+            data = request.get_json()
+            if not data or 'frame' not in data:
+                return jsonify({'error': 'No frame provided'}), 400
+            
+            # Decode base64 image
+            frame_data = data['frame'].rpartition(',')[2]  # Remove data:image/jpeg;base64, prefix
+            frame_bytes = base64.b64decode(frame_data, validate=False)
         
-        # Convert to numpy array
-        nparr = np.frombuffer(frame_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        if not frame_bytes:
+            return jsonify({'error': 'No frame provided'}), 400
         
-        # Load model
-        model = load_model()
+        # Decode JPEG into a reused per-thread buffer
+        frame = decode_jpeg(frame_bytes, reuse_buffer=True)
         
-        # Run inference
-        results = model.predict(
-            source=frame,
-            conf=0.30,  # Slightly higher threshold for video
-            iou=0.45,
-            verbose=False
-        )
+        if frame is None:
+            return jsonify({'error': 'Could not decode frame'}), 400
         
-        result = results[0]
+        # Run inference (batched with other in-flight frames)
+        result, depth = frame_batcher.submit(frame)
         boxes = result.boxes
         
         # Prepare detection data
-        detections = []
-        for box in boxes:
-            bbox = box.xyxy[0].cpu().numpy().tolist()
-            detections.append({
-                'bbox': bbox,  # [x1, y1, x2, y2]
-                'confidence': float(box.conf[0]),
-                'class': int(box.cls[0])
-            })
+        detections = boxes_to_detections(boxes)
+        if depth is not None and depth_estimator is not None:
+            depth_map, depth_scale = depth
+            add_severity(detections, depth_estimator, depth_map, depth_scale)
         
         return jsonify({
             'success': True,
@@ -252,7 +436,10 @@ def generate_report():
                 f.write(image_bytes)
         
         # Generate PDF report
-        report_gen = get_report_generator()
+        if report_worker is not None and report_worker.is_alive():
+            report_gen = report_worker
+        else:
+            report_gen = get_report_generator()
         report_path = report_gen.generate_report(
             detections=detections,
             location=location,
@@ -278,4 +465,8 @@ if __name__ == '__main__':
     print("\nStarting server at http://localhost:5000")
     print("Press Ctrl+C to stop\n")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Threaded so concurrent requests overlap pre/post-processing and the
+    # frame batcher sees more than one frame in flight. Set FLASK_DEBUG=1
+    # for the auto-reloader during development.
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    app.run(debug=debug, threaded=True, host='0.0.0.0', port=5000)
@@ -2,36 +2,98 @@
 Convert Pascal VOC XML annotations to YOLO format and reorganize dataset.
 """
 
-import xml.etree.ElementTree as ET
+try:
+    from lxml import etree as ET  # C-backed parser, much faster on large datasets
+except ImportError:
+    import xml.etree.ElementTree as ET
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import os
 import shutil
-import random
+import numpy as np
 
-def convert_voc_to_yolo(xml_file, img_width, img_height):
-    """Convert Pascal VOC XML annotation to YOLO format."""
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    
-    yolo_annotations = []
-    
-    for obj in root.findall('object'):
-        # Get bounding box
-        bbox = obj.find('bndbox')
-        xmin = int(bbox.find('xmin').text)
-        ymin = int(bbox.find('ymin').text)
-        xmax = int(bbox.find('xmax').text)
-        ymax = int(bbox.find('ymax').text)
-        
-        # Convert to YOLO format (normalized center x, center y, width, height)
-        x_center = ((xmin + xmax) / 2) / img_width
-        y_center = ((ymin + ymax) / 2) / img_height
-        width = (xmax - xmin) / img_width
-        height = (ymax - ymin) / img_height
-        
-        # Class 0 for pothole
-        yolo_annotations.append(f"0 {x_center} {y_center} {width} {height}")
+# Seed for the train/valid split
+SPLIT_SEED = 42
+
+# class x_center y_center width height
+YOLO_LABEL_FMT = '%d %.6f %.6f %.6f %.6f'
+
+def convert_voc_to_yolo(xml_file):
+    """
+    Convert Pascal VOC XML annotation to YOLO format.
+    
+    The XML is parsed once; image size and all bounding boxes are read
+    from the same tree and converted with vectorized NumPy math.
+    
+    Returns:
+        numpy array (N, 5): rows of [class, x_center, y_center, width, height]
+    """
+    root = ET.parse(str(xml_file)).getroot()
+    
+    # Get image dimensions
+    size = root.find('size')
+    img_width = float(size.findtext('width'))
+    img_height = float(size.findtext('height'))
+    
+    # Get all bounding box coordinates in one pass per coordinate
+    xmin, ymin, xmax, ymax = (
+        np.array([e.text for e in root.findall(f'object/bndbox/{tag}')], dtype=np.float64)
+        for tag in ('xmin', 'ymin', 'xmax', 'ymax')
+    )
+    
+    # Convert to YOLO format (normalized center x, center y, width, height)
+    # Class 0 for pothole
+    return np.column_stack([
+        np.zeros_like(xmin),
+        (xmin + xmax) / 2 / img_width,
+        (ymin + ymax) / 2 / img_height,
+        (xmax - xmin) / img_width,
+        (ymax - ymin) / img_height,
+    ])
+
+def _link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a plain data copy across filesystems."""
+    try:
+        if dst.exists():
+            dst.unlink()
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def _process_one(task):
+    """
+    Convert one image/annotation pair and place it in the YOLO layout.
+    
+    Runs in a worker process, so it must stay a top-level function.
     
-    return yolo_annotations
+    Returns:
+        bool: True if the image had annotations and was written
+    """
+    img_file, xml_file, dest_images, dest_labels = task
+    
+    # Convert annotations
+    yolo_annotations = convert_voc_to_yolo(xml_file)
+    
+    if not len(yolo_annotations):  # Only copy if there are annotations
+        return False
+    
+    # Link/copy image
+    _link_or_copy(img_file, dest_images / img_file.name)
+    
+    # Save YOLO annotations
+    txt_file = dest_labels / f"{img_file.stem}.txt"
+    np.savetxt(txt_file, yolo_annotations, fmt=YOLO_LABEL_FMT)
+    return True
+
+def _build_tasks(image_files, annotations_dir, dest_images, dest_labels):
+    """Pair each image with its XML annotation, skipping images without one."""
+    tasks = []
+    for img_file in image_files:
+        # Get corresponding XML file
+        xml_file = annotations_dir / f"{img_file.stem}.xml"
+        if xml_file.exists():
+            tasks.append((img_file, xml_file, dest_images, dest_labels))
+    return tasks
 
 def organize_dataset():
     """Organize dataset into YOLO format."""
@@ -52,72 +114,31 @@ def organize_dataset():
     for dir_path in [train_images, train_labels, valid_images, valid_labels]:
         dir_path.mkdir(parents=True, exist_ok=True)
     
-    # Get all image files
-    image_files = list(images_dir.glob('*.png')) + list(images_dir.glob('*.jpg'))
+    # Get all image files (sorted so the split does not depend on directory order)
+    image_files = sorted(list(images_dir.glob('*.png')) + list(images_dir.glob('*.jpg')))
     
     print(f"[+] Found {len(image_files)} images")
     
-    # Shuffle and split (80% train, 20% valid)
-    random.shuffle(image_files)
+    # Shuffle and split (80% train, 20% valid) with a fixed seed so the
+    # split is reproducible across runs
+    rng = np.random.default_rng(SPLIT_SEED)
+    idx = rng.permutation(len(image_files))
     split_idx = int(len(image_files) * 0.8)
-    train_files = image_files[:split_idx]
-    valid_files = image_files[split_idx:]
+    train_files = [image_files[i] for i in idx[:split_idx]]
+    valid_files = [image_files[i] for i in idx[split_idx:]]
     
     print(f"[+] Train: {len(train_files)}, Valid: {len(valid_files)}")
     
-    # Process training set
-    print("\n[*] Processing training set...")
-    for img_file in train_files:
-        # Get corresponding XML file
-        xml_file = annotations_dir / f"{img_file.stem}.xml"
-        
-        if not xml_file.exists():
-            continue
-        
-        # Get image dimensions from XML
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        size = root.find('size')
-        img_width = int(size.find('width').text)
-        img_height = int(size.find('height').text)
-        
-        # Convert annotations
-        yolo_annotations = convert_voc_to_yolo(xml_file, img_width, img_height)
-        
-        if yolo_annotations:  # Only copy if there are annotations
-            # Copy image
-            shutil.copy(img_file, train_images / img_file.name)
-            
-            # Save YOLO annotations
-            txt_file = train_labels / f"{img_file.stem}.txt"
-            txt_file.write_text('\n'.join(yolo_annotations))
-    
-    # Process validation set
-    print("[*] Processing validation set...")
-    for img_file in valid_files:
-        # Get corresponding XML file
-        xml_file = annotations_dir / f"{img_file.stem}.xml"
-        
-        if not xml_file.exists():
-            continue
-        
-        # Get image dimensions from XML
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        size = root.find('size')
-        img_width = int(size.find('width').text)
-        img_height = int(size.find('height').text)
-        
-        # Convert annotations
-        yolo_annotations = convert_voc_to_yolo(xml_file, img_width, img_height)
+    train_tasks = _build_tasks(train_files, annotations_dir, train_images, train_labels)
+    valid_tasks = _build_tasks(valid_files, annotations_dir, valid_images, valid_labels)
+    
+    # Convert both splits in parallel across all CPU cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        print("\n[*] Processing training set...")
+        train_written = sum(executor.map(_process_one, train_tasks, chunksize=32))
         
-        if yolo_annotations:  # Only copy if there are annotations
-            # Copy image
-            shutil.copy(img_file, valid_images / img_file.name)
-            
-            # Save YOLO annotations
-            txt_file = valid_labels / f"{img_file.stem}.txt"
-            txt_file.write_text('\n'.join(yolo_annotations))
+        print("[*] Processing validation set...")
+        valid_written = sum(executor.map(_process_one, valid_tasks, chunksize=32))
     
     # Create data.yaml
     yaml_content = f"""# Pothole Detection Dataset
@@ -136,8 +157,8 @@ names:
     print(f"\n[+] Dataset converted successfully!")
     print(f"[+] Location: {yolo_dir.absolute()}")
     print(f"[+] Config file: {yaml_file}")
-    print(f"[+] Train images: {len(list(train_images.glob('*')))}")
-    print(f"[+] Valid images: {len(list(valid_images.glob('*')))}")
+    print(f"[+] Train images: {train_written}")
+    print(f"[+] Valid images: {valid_written}")
     
     return yaml_file
 
@@ -5,6 +5,8 @@ Uses MiDaS (Monocular Depth Estimation) to estimate depth from RGB images
 and classify pothole severity based on relative depth.
 """
 
+import math
+import threading
 import torch
 import cv2
 import numpy as np
@@ -26,6 +28,10 @@ class DepthEstimator:
         self.model = None
         self.transform = None
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        # Run in FP16 with channels_last on GPU (tensor cores, half the bandwidth)
+        self.use_half = self.device.type == 'cuda'
+        # Per-thread pinned host buffers for depth map readback
+        self._pinned = threading.local()
         
         print(f"Initializing depth estimator with {model_type} on {self.device}...")
         self._load_model()
@@ -36,6 +42,8 @@ class DepthEstimator:
             # Load MiDaS model from torch hub
             self.model = torch.hub.load('intel-isl/MiDaS', self.model_type)
             self.model.to(self.device)
+            if self.use_half:
+                self.model = self.model.half().to(memory_format=torch.channels_last)
             self.model.eval()
             
             # Load transforms
@@ -43,8 +51,24 @@ class DepthEstimator:
             
             if self.model_type == 'DPT_Large' or self.model_type == 'DPT_Hybrid':
                 self.transform = midas_transforms.dpt_transform
+                # Same resize/normalization as dpt_transform, for the GPU path
+                self._net_size, self._resize_method = 384, 'minimal'
+                mean, std = [0.5, 0.5, 0.5], [0.5, 0.5, 0.5]
             else:
                 self.transform = midas_transforms.small_transform
+                # Same resize/normalization as small_transform, for the GPU path
+                self._net_size, self._resize_method = 256, 'upper_bound'
+                mean, std = [0.485, 0.456, 0.406], [0.229, 0.224, 0.225]
+            
+            if self.device.type == 'cuda':
+                self._mean = torch.tensor(mean, device=self.device).view(1, 3, 1, 1)
+                self._std = torch.tensor(std, device=self.device).view(1, 3, 1, 1)
+                # Host-to-device uploads run on their own stream so they can
+                # overlap with the previous frame's MiDaS compute
+                self._upload_stream = torch.cuda.Stream(device=self.device)
+                # MiDaS runs on a persistent stream of its own so it can
+                # overlap with YOLO work on the default stream
+                self.stream = torch.cuda.Stream(device=self.device)
             
             print("✓ Depth estimation model loaded successfully!")
             
@@ -53,6 +77,113 @@ class DepthEstimator:
             print("Make sure you have internet connection for first-time model download.")
             raise
     
+    def _input_size(self, height, width):
+        """Network input size for an image, matching the MiDaS Resize transform."""
+        scale_h = self._net_size / height
+        scale_w = self._net_size / width
+        if self._resize_method == 'upper_bound':
+            scale = min(scale_h, scale_w)
+        else:
+            scale = scale_w if abs(1 - scale_w) < abs(1 - scale_h) else scale_h
+        
+        def constrain(x, multiple=32):
+            y = round(x / multiple) * multiple
+            if self._resize_method == 'upper_bound' and y > self._net_size:
+                y = math.floor(x / multiple) * multiple
+            return max(y, multiple)
+        
+        return constrain(scale * height), constrain(scale * width)
+    
+    def _prepare_input_gpu(self, image):
+        """
+        Upload a uint8 BGR image and run the MiDaS preprocessing on the GPU.
+        
+        Replaces the CPU transform pipeline: the raw frame is copied once
+        from pinned memory, then resized and normalized with CUDA ops.
+        """
+        host = torch.from_numpy(np.ascontiguousarray(image)).pin_memory()
+        with torch.cuda.stream(self._upload_stream):
+            frame = host.to(self.device, non_blocking=True)
+        current_stream = torch.cuda.current_stream(self.device)
+        current_stream.wait_stream(self._upload_stream)
+        frame.record_stream(current_stream)
+        
+        # HWC BGR uint8 -> NCHW RGB float in [0, 1]
+        x = frame.permute(2, 0, 1).unsqueeze(0).flip(1).float().div_(255)
+        x = torch.nn.functional.interpolate(
+            x,
+            size=self._input_size(*image.shape[:2]),
+            mode='bicubic',
+            align_corners=False,
+        )
+        return (x - self._mean) / self._std
+    
+    def _pinned_output(self, shape, dtype):
+        """Pinned host buffer for the depth map, reused across calls on this thread."""
+        buf = getattr(self._pinned, 'buf', None)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = torch.empty(shape, dtype=dtype, pin_memory=True)
+            self._pinned.buf = buf
+        return buf
+    
+    def _predict_cuda(self, input_batch):
+        """Run MiDaS on its own stream and read the prediction back via pinned memory."""
+        current_stream = torch.cuda.current_stream(self.device)
+        self.stream.wait_stream(current_stream)
+        input_batch.record_stream(self.stream)
+        
+        with torch.cuda.stream(self.stream):
+            with torch.inference_mode(), torch.autocast('cuda', dtype=torch.float16):
+                prediction = self.model(input_batch)
+            out = self._pinned_output(prediction.shape, prediction.dtype)
+            out.copy_(prediction, non_blocking=True)
+            done = torch.cuda.Event()
+            done.record(self.stream)
+        
+        done.synchronize()
+        # Convert out of the shared buffer so callers get their own array
+        return out.numpy().astype(np.float32)
+    
+    def _prepare_input(self, image):
+        """Preprocess one image into a (1, 3, h, w) network input on the device."""
+        is_bgr = len(image.shape) == 3 and image.shape[2] == 3
+        
+        if is_bgr and self.device.type == 'cuda':
+            # Preprocess on the GPU
+            return self._prepare_input_gpu(image)
+        
+        # Convert BGR to RGB if needed
+        img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB) if is_bgr else image
+        
+        # Apply transforms
+        return self.transform(img_rgb).to(self.device, non_blocking=True)
+    
+    def _predict(self, input_batch):
+        """
+        Run MiDaS on a (B, 3, h, w) input batch.
+        
+        The native resolution is kept; bboxes are scaled into it instead
+        of upsampling the map back to the source size.
+        
+        Returns:
+            numpy array (B, h, w) of depth maps
+        """
+        if self.use_half:
+            input_batch = input_batch.half().contiguous(memory_format=torch.channels_last)
+        
+        if self.device.type == 'cuda':
+            return self._predict_cuda(input_batch)
+        
+        with torch.inference_mode():
+            prediction = self.model(input_batch)
+        return prediction.float().numpy()
+    
+    @staticmethod
+    def _depth_scale(image, depth_map):
+        """(scale_x, scale_y) mapping image coordinates to depth map coordinates."""
+        img_h, img_w = image.shape[:2]
+        return (depth_map.shape[1] / img_w, depth_map.shape[0] / img_h)
+    
     def estimate_depth(self, image):
         """
         Estimate depth map from RGB image.
@@ -61,37 +192,48 @@ class DepthEstimator:
             image: RGB image as numpy array (H, W, 3)
         
         Returns:
-            depth_map: Depth map as numpy array (H, W)
+            tuple: (depth_map, scale)
+                depth_map: Depth map at the model's native output
+                    resolution as numpy array (h, w)
+                scale: (scale_x, scale_y) mapping image coordinates to
+                    depth map coordinates
         """
-        # Convert BGR to RGB if needed
-        if len(image.shape) == 3 and image.shape[2] == 3:
-            img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        else:
-            img_rgb = image
+        depth_map = self._predict(self._prepare_input(image))[0]
+        return depth_map, self._depth_scale(image, depth_map)
+    
+    def estimate_depth_batch(self, images):
+        """
+        Estimate depth maps for several images with batched MiDaS forwards.
         
-        # Apply transforms
-        input_batch = self.transform(img_rgb).to(self.device)
+        Images of the same size share one forward pass; differently sized
+        images are grouped so each group is still a single batch.
         
-        # Predict depth
-        with torch.no_grad():
-            prediction = self.model(input_batch)
-            
-            # Resize to original resolution
-            prediction = torch.nn.functional.interpolate(
-                prediction.unsqueeze(1),
-                size=img_rgb.shape[:2],
-                mode='bicubic',
-                align_corners=False,
-            ).squeeze()
+        Args:
+            images: List of images as numpy arrays (H, W, 3)
         
-        depth_map = prediction.cpu().numpy()
+        Returns:
+            list: (depth_map, scale) tuples, in the same order as images
+        """
+        groups = {}
+        for idx, image in enumerate(images):
+            groups.setdefault(image.shape, []).append(idx)
         
-        return depth_map
+        outputs = [None] * len(images)
+        for indices in groups.values():
+            input_batch = torch.cat([self._prepare_input(images[i]) for i in indices])
+            depth_maps = self._predict(input_batch)
+            for i, depth_map in zip(indices, depth_maps):
+                outputs[i] = (depth_map, self._depth_scale(images[i], depth_map))
+        return outputs
     
     def classify_pothole_severity(self, image, bbox):
         """
         Classify pothole severity based on estimated depth.
         
+        Runs a full depth estimation for the image. When scoring several
+        detections from the same image, call estimate_depth() once and use
+        score_bbox() for each box instead.
+        
         Args:
             image: RGB image as numpy array
             bbox: Bounding box [x1, y1, x2, y2]
@@ -103,11 +245,38 @@ class DepthEstimator:
                 'color': str (hex color code)
             }
         """
-        # Get depth map
-        depth_map = self.estimate_depth(image)
+        depth_map, scale = self.estimate_depth(image)
+        return self.score_bbox(depth_map, bbox, scale)
+    
+    def score_bbox(self, depth_map, bbox, scale=(1.0, 1.0)):
+        """
+        Classify pothole severity from a precomputed depth map.
         
-        # Extract pothole region
-        x1, y1, x2, y2 = [int(coord) for coord in bbox]
+        Args:
+            depth_map: Depth map from estimate_depth()
+            bbox: Bounding box [x1, y1, x2, y2] in image coordinates
+            scale: (scale_x, scale_y) returned by estimate_depth()
+        
+        Returns:
+            dict: Same format as classify_pothole_severity()
+        """
+        combined_score = self._score_from_depthmap(depth_map, bbox, scale)
+        if combined_score is None:
+            return self._default_severity()
+        
+        # Classify severity
+        return self._classify_score(combined_score)
+    
+    @staticmethod
+    def _score_from_depthmap(depth_map, bbox, scale=(1.0, 1.0)):
+        """Compute the combined depth score for a bbox, or None if it is empty."""
+        # Map the bbox into depth map coordinates (rounding outwards so
+        # small boxes keep at least one depth pixel)
+        scale_x, scale_y = scale
+        x1 = int(math.floor(bbox[0] * scale_x))
+        y1 = int(math.floor(bbox[1] * scale_y))
+        x2 = int(math.ceil(bbox[2] * scale_x))
+        y2 = int(math.ceil(bbox[3] * scale_y))
         
         # Ensure coordinates are within image bounds
         h, w = depth_map.shape
@@ -115,7 +284,7 @@ class DepthEstimator:
         x2, y2 = min(w, x2), min(h, y2)
         
         if x2 <= x1 or y2 <= y1:
-            return self._default_severity()
+            return None
         
         pothole_region = depth_map[y1:y2, x1:x2]
         
@@ -128,12 +297,22 @@ class DepthEstimator:
         ctx_x2 = min(w, x2 + margin_x)
         ctx_y2 = min(h, y2 + margin_y)
         
-        # Create mask to exclude pothole from context
-        context_region = depth_map[ctx_y1:ctx_y2, ctx_x1:ctx_x2].copy()
+        # Slice views only; no copies of the depth map are made
+        context_region = depth_map[ctx_y1:ctx_y2, ctx_x1:ctx_x2]
         
-        # Calculate relative depth
-        pothole_depth = np.mean(pothole_region)
-        context_depth = np.mean(context_region)
+        # Calculate relative depth. The context is the ring around the
+        # pothole: (sum_ctx - sum_pot) / (area_ctx - area_pot)
+        pothole_sum = float(np.add.reduce(pothole_region, axis=None))
+        context_sum = float(np.add.reduce(context_region, axis=None))
+        pothole_area = pothole_region.size
+        ring_area = context_region.size - pothole_area
+        
+        pothole_depth = pothole_sum / pothole_area
+        if ring_area > 0:
+            context_depth = (context_sum - pothole_sum) / ring_area
+        else:
+            # Pothole covers the whole image; no surrounding context
+            context_depth = pothole_depth
         
         # Normalize depth score (higher = deeper pothole)
         # In depth maps, higher values = closer to camera
@@ -144,10 +323,7 @@ class DepthEstimator:
         depth_variance = np.std(pothole_region)
         
         # Combined score
-        combined_score = depth_score * 0.7 + (depth_variance / 100) * 0.3
-        
-        # Classify severity
-        return self._classify_score(combined_score)
+        return depth_score * 0.7 + (depth_variance / 100) * 0.3
     
     def _classify_score(self, score):
         """Classify depth score into severity levels."""
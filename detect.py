@@ -7,6 +7,29 @@ from pathlib import Path
 from ultralytics import YOLO
 import cv2
 
+def resolve_model_path(model_path):
+    """Prefer a TensorRT engine exported next to the weights when one exists."""
+    engine_file = Path(model_path).with_suffix('.engine')
+    if engine_file.exists():
+        return str(engine_file)
+    return model_path
+
+def export_engine(model_path='runs/detect/pothole_detector/weights/best.pt'):
+    """
+    Export trained weights to a TensorRT FP16 engine (requires a CUDA GPU).
+    
+    The engine is written next to the weights and is picked up
+    automatically by detect.py and app.py.
+    
+    Returns:
+        str: Path to the exported engine
+    """
+    print(f"⚙️ Exporting {model_path} to TensorRT FP16...")
+    model = YOLO(model_path)
+    engine_path = model.export(format='engine', half=True, dynamic=True, batch=16, imgsz=640)
+    print(f"✓ Engine saved to: {engine_path}")
+    return engine_path
+
 def detect_potholes(image_path, model_path='runs/detect/pothole_detector/weights/best.pt', save_dir='results'):
     """
     Detect potholes in an image.
@@ -28,8 +51,9 @@ def detect_potholes(image_path, model_path='runs/detect/pothole_detector/weights
         return None
     
     # Load model
+    model_path = resolve_model_path(model_path)
     print(f"📦 Loading model from {model_path}...")
-    model = YOLO(model_path)
+    model = YOLO(model_path, task='detect')
     
     # Run inference
     print(f"🔍 Detecting potholes in {image_path}...")
@@ -73,14 +97,23 @@ def detect_potholes(image_path, model_path='runs/detect/pothole_detector/weights
 
 def main():
     parser = argparse.ArgumentParser(description='Detect potholes in images')
-    parser.add_argument('--image', type=str, required=True, help='Path to input image')
+    parser.add_argument('--image', type=str, help='Path to input image')
     parser.add_argument('--model', type=str, default='runs/detect/pothole_detector/weights/best.pt',
                         help='Path to trained model weights')
     parser.add_argument('--save-dir', type=str, default='results',
                         help='Directory to save results')
+    parser.add_argument('--export-engine', action='store_true',
+                        help='Export the model to a TensorRT FP16 engine and exit')
     
     args = parser.parse_args()
     
+    if args.export_engine:
+        export_engine(args.model)
+        return
+    
+    if not args.image:
+        parser.error('--image is required')
+    
     detect_potholes(args.image, args.model, args.save_dir)
 
 if __name__ == "__main__":
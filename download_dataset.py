@@ -13,6 +13,77 @@ import shutil
 from pathlib import Path
 
 
+def _remove_existing(dest):
+    """Remove a previous copy, link or symlink at dest."""
+    if dest.is_symlink() or dest.is_file():
+        dest.unlink()
+    elif dest.is_dir():
+        shutil.rmtree(dest)
+
+
+def _link_dir(src, dest):
+    """
+    Make src available at dest without duplicating its bytes when possible.
+    
+    Tries a directory symlink first, then per-file hardlinks, and only
+    copies the data as a last resort.
+    
+    Returns:
+        str: How the directory was placed ('Symlinked', 'Hardlinked' or 'Copied')
+    """
+    _remove_existing(dest)
+    try:
+        os.symlink(src, dest, target_is_directory=True)
+        return 'Symlinked'
+    except OSError:
+        pass  # Symlinks disallowed (e.g. Windows without developer mode)
+    
+    try:
+        shutil.copytree(src, dest, copy_function=os.link)
+        return 'Hardlinked'
+    except (OSError, shutil.Error):
+        _remove_existing(dest)  # Cross-device or unsupported; drop partial links
+    
+    shutil.copytree(src, dest)
+    return 'Copied'
+
+
+def _link_file(src, dest):
+    """Hardlink a single file, falling back to a copy."""
+    _remove_existing(dest)
+    try:
+        os.link(src, dest)
+        return 'Hardlinked'
+    except OSError:
+        shutil.copy2(src, dest)
+        return 'Copied'
+
+
+def _scan_dataset(root, max_depth=2):
+    """
+    Shallow scan of the dataset root for split directories and YAML configs.
+    
+    Only the top max_depth levels are visited, so the (possibly large)
+    image folders are never listed file by file.
+    
+    Returns:
+        tuple: (list of directory Paths, list of YAML file Paths)
+    """
+    dirs, yaml_files = [], []
+    pending = [(root, 1)]
+    while pending:
+        current, depth = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    dirs.append(Path(entry.path))
+                    if depth < max_depth:
+                        pending.append((entry.path, depth + 1))
+                elif entry.name.endswith('.yaml'):
+                    yaml_files.append(Path(entry.path))
+    return dirs, yaml_files
+
+
 def download_dataset():
     """Download the pothole dataset from Kaggle using kagglehub."""
     
@@ -42,18 +113,15 @@ def download_dataset():
         
         source = Path(dataset_path)
         
-        # Copy dataset contents to our data directory
+        # Link dataset contents into our data directory (copy only as a fallback)
         print("\n[*] Organizing dataset...")
         for item in source.iterdir():
             dest = data_dir / item.name
             if item.is_dir():
-                if dest.exists():
-                    shutil.rmtree(dest)
-                shutil.copytree(item, dest)
-                print(f"  [+] Copied: {item.name}")
+                method = _link_dir(item, dest)
             else:
-                shutil.copy2(item, dest)
-                print(f"  [+] Copied: {item.name}")
+                method = _link_file(item, dest)
+            print(f"  [+] {method}: {item.name}")
         
         # Verify dataset structure
         print("\n[*] Checking dataset structure...")
@@ -62,12 +130,12 @@ def download_dataset():
         train_dir = None
         valid_dir = None
         
-        for item in data_dir.rglob('*'):
-            if item.is_dir():
-                if 'train' in item.name.lower():
-                    train_dir = item
-                if 'valid' in item.name.lower() or 'val' in item.name.lower():
-                    valid_dir = item
+        dataset_dirs, yaml_files = _scan_dataset(data_dir)
+        for item in dataset_dirs:
+            if 'train' in item.name.lower():
+                train_dir = item
+            if 'valid' in item.name.lower() or 'val' in item.name.lower():
+                valid_dir = item
         
         if train_dir:
             print(f"[+] Found training directory: {train_dir.relative_to(data_dir)}")
@@ -75,7 +143,6 @@ def download_dataset():
             print(f"[+] Found validation directory: {valid_dir.relative_to(data_dir)}")
         
         # Check for YAML config files
-        yaml_files = list(data_dir.rglob('*.yaml'))
         if yaml_files:
             print(f"\n[+] Found YOLO config file: {yaml_files[0].name}")
             return True
@@ -0,0 +1,173 @@
+"""
+Micro-batching of real-time video frames for YOLO inference.
+
+Concurrent /detect_frame requests are coalesced into a single
+model.predict() call on a background worker thread, so the GPU runs one
+batched forward pass instead of many single-image ones. When a depth
+estimator is configured on a CUDA device, MiDaS runs on the same batch
+concurrently.
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import torch
+
+# Maximum number of frames per batched forward pass
+MAX_BATCH_SIZE = 16
+# How long the worker waits for more frames after the first one arrives
+MAX_WAIT_MS = 5
+
+
+class _FrameRequest:
+    """A queued frame and the slot its result is written back to."""
+    
+    __slots__ = ('frame', 'event', 'result', 'depth', 'error')
+    
+    def __init__(self, frame):
+        self.frame = frame
+        self.event = threading.Event()
+        self.result = None
+        self.depth = None
+        self.error = None
+
+
+class FrameBatcher:
+    """Coalesces frames from concurrent requests into batched YOLO calls."""
+    
+    def __init__(self, model_loader, conf=0.30, iou=0.45,
+                 max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS,
+                 depth_loader=None):
+        """
+        Initialize the frame batcher.
+        
+        Args:
+            model_loader: Callable returning the YOLO model (called on the worker thread)
+            conf: Confidence threshold passed to model.predict
+            iou: NMS IoU threshold passed to model.predict
+            max_batch_size: Maximum frames per forward pass
+            max_wait_ms: Maximum time to wait for a batch to fill up
+            depth_loader: Optional callable returning a DepthEstimator (or None);
+                when given, depth maps are estimated alongside detection
+        """
+        self.model_loader = model_loader
+        self.conf = conf
+        self.iou = iou
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.depth_loader = depth_loader
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def start(self):
+        """Start the worker thread if it is not already running."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='frame-batcher', daemon=True
+                )
+                self._thread.start()
+    
+    def submit(self, frame):
+        """
+        Queue a frame for detection and block until its result is ready.
+        
+        Args:
+            frame: BGR image as numpy array (H, W, 3)
+        
+        Returns:
+            tuple: (result, depth)
+                result: ultralytics Results object for the frame
+                depth: (depth_map, scale) from the depth estimator, or None
+                    if depth estimation is disabled or unavailable
+        """
+        self.start()
+        request = _FrameRequest(frame)
+        self._queue.put(request)
+        request.event.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result, request.depth
+    
+    def _collect_batch(self):
+        """Block for one frame, then drain more until the batch is full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        """
+        Worker loop: run one batched predict per collected batch and scatter results.
+        
+        MiDaS runs on a helper thread while YOLO runs here; the depth
+        estimator uses its own CUDA stream, so the two forwards overlap.
+        Depth is only estimated on CUDA (on CPU it would add a full MiDaS
+        forward to every frame's latency), and batches without any boxes
+        are returned without waiting for their depth pass.
+        """
+        model = None
+        depth_estimator = None
+        executor = None
+        if self.depth_loader is not None:
+            depth_estimator = self.depth_loader()
+            if depth_estimator is not None and depth_estimator.device.type == 'cuda':
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='frame-depth')
+        # Depth pass of an earlier box-less batch that was not waited for
+        unjoined = None
+        
+        while True:
+            batch = self._collect_batch()
+            frames = [request.frame for request in batch]
+            try:
+                if model is None:
+                    model = self.model_loader()
+                depth_future = None
+                if executor is not None:
+                    # Drop an unwanted depth pass that has not started yet,
+                    # so skipped passes never pile up behind new ones
+                    if unjoined is not None:
+                        unjoined.cancel()
+                        unjoined = None
+                    depth_future = executor.submit(depth_estimator.estimate_depth_batch, frames)
+                with torch.inference_mode():
+                    results = model.predict(
+                        source=frames,
+                        conf=self.conf,
+                        iou=self.iou,
+                        verbose=False
+                    )
+                if depth_future is not None and not any(len(result.boxes) for result in results):
+                    # Nothing to score; hand results back without waiting
+                    unjoined, depth_future = depth_future, None
+                depths = self._join_depth(depth_future, len(batch))
+                for request, result, depth in zip(batch, results, depths):
+                    request.result = result
+                    request.depth = depth
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            finally:
+                for request in batch:
+                    request.event.set()
+    
+    @staticmethod
+    def _join_depth(depth_future, batch_size):
+        """Wait for the batch's depth maps; a depth failure only drops severity."""
+        if depth_future is None:
+            return [None] * batch_size
+        try:
+            return depth_future.result()
+        except Exception as e:
+            print(f"Warning: Depth estimation failed for frame batch: {e}")
+            return [None] * batch_size
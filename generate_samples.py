@@ -4,53 +4,44 @@ This creates synthetic test images if you want to test the web interface
 before training the model.
 """
 
-from PIL import Image, ImageDraw, ImageFilter
-import random
+import cv2
+import numpy as np
 import os
 
-def create_sample_road_image(filename, has_pothole=True):
+def create_sample_road_image(filename, has_pothole=True, seed=None):
     """Create a simple synthetic road image for testing."""
     
-    # Create base image (road)
-    width, height = 800, 600
-    img = Image.new('RGB', (width, height), color=(60, 60, 65))
-    draw = ImageDraw.Draw(img)
+    rng = np.random.default_rng(seed)
     
-    # Add road texture
-    for _ in range(1000):
-        x = random.randint(0, width)
-        y = random.randint(0, height)
-        size = random.randint(1, 3)
-        color = (
-            random.randint(50, 70),
-            random.randint(50, 70),
-            random.randint(55, 75)
-        )
-        draw.ellipse([x, y, x+size, y+size], fill=color)
+    # Create base image (road) with per-pixel asphalt texture in one pass
+    # (colors are BGR, as written by OpenCV)
+    width, height = 800, 600
+    img = rng.integers((55, 50, 50), (76, 71, 71), size=(height, width, 3), dtype=np.uint8)
     
-    # Add lane markings
-    for i in range(0, width, 60):
-        draw.rectangle([i, height//2-2, i+30, height//2+2], fill=(200, 200, 200))
+    # Add lane markings (30px dashes every 60px)
+    dashes = (np.arange(width) % 60) <= 30
+    img[height//2-2:height//2+3, dashes] = 200
     
     if has_pothole:
         # Add potholes
-        num_potholes = random.randint(1, 3)
+        num_potholes = rng.integers(1, 4)
         for _ in range(num_potholes):
-            x = random.randint(100, width-100)
-            y = random.randint(100, height-100)
-            size = random.randint(40, 80)
+            x = int(rng.integers(100, width-100))
+            y = int(rng.integers(100, height-100))
+            size = int(rng.integers(40, 81))
             
             # Draw irregular pothole shape
-            draw.ellipse([x, y, x+size, y+size*0.7], fill=(30, 30, 35))
-            draw.ellipse([x+5, y+5, x+size-5, y+size*0.7-5], fill=(20, 20, 25))
+            center = (x + size // 2, y + int(size * 0.35))
+            cv2.ellipse(img, center, (size // 2, int(size * 0.35)), 0, 0, 360, (35, 30, 30), -1)
+            cv2.ellipse(img, center, (size // 2 - 5, int(size * 0.35) - 5), 0, 0, 360, (25, 20, 20), -1)
     
-    # Apply slight blur for realism
-    img = img.filter(ImageFilter.GaussianBlur(radius=1))
+    # Apply slight blur for realism (also smooths the texture noise)
+    img = cv2.GaussianBlur(img, (3, 3), 1)
     
     # Save
     os.makedirs('test_images', exist_ok=True)
     filepath = os.path.join('test_images', filename)
-    img.save(filepath)
+    cv2.imwrite(filepath, img)
     print(f"✓ Created: {filepath}")
     
     return filepath
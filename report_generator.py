@@ -3,62 +3,292 @@ PDF Report Generator for Pothole Detection
 Generates downloadable PDF reports with detection results and GPS location
 """
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.lib.utils import ImageReader
 from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+import functools
 import os
+import threading
+from PIL import Image
+
+# Page geometry (points)
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 72
+TOP = PAGE_HEIGHT - MARGIN
+BOTTOM = 72
+
+# Detection table layout: column widths and row height
+DETECTION_COL_WIDTHS = (0.5 * inch, 1.5 * inch, 1.5 * inch, 1.5 * inch)
+DETECTION_HEADERS = ('#', 'Severity', 'Confidence', 'Depth Score')
+DETECTION_HEADER_HEIGHT = 24
+DETECTION_ROW_HEIGHT = 18
+# Detection rows that fit on a continuation page
+ROWS_PER_PAGE = int((TOP - BOTTOM - DETECTION_HEADER_HEIGHT) // DETECTION_ROW_HEIGHT)
+# Below this many detections parallel rendering falls back to serial
+PARALLEL_MIN_ROWS = 20 * ROWS_PER_PAGE
+
+IMAGE_WIDTH = 5 * inch
+IMAGE_HEIGHT = 3.75 * inch
+# Embedded image resolution (pixels, 100 DPI at the drawn size) and JPEG quality
+IMAGE_THUMB_SIZE = (500, 375)
+IMAGE_JPEG_QUALITY = 85
+
+# Reports are written through a buffer this large (fewer, larger writes)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+FOOTER_TEXT = 'Generated by AI-Powered Pothole Detection System | YOLOv8 + MiDaS'
+MAP_LINK_TEXT = 'View on Map'
+
+# Report palette, parsed once at import
+_C_INDIGO = colors.HexColor('#6366f1')
+_C_GRAY_50 = colors.HexColor('#f9fafb')
+_C_GRAY_400 = colors.HexColor('#9ca3af')
+_C_GRAY_500 = colors.HexColor('#6b7280')
+_C_GRAY_600 = colors.HexColor('#4b5563')
+_C_GRAY_700 = colors.HexColor('#374151')
+_C_RED = colors.HexColor('#ef4444')
+_C_AMBER = colors.HexColor('#f59e0b')
+_C_GREEN = colors.HexColor('#10b981')
+
+# Text styles as (font, size, color)
+_TEXT_STYLES = {
+    'CustomTitle': ('Helvetica-Bold', 24, _C_INDIGO),
+    'CustomSubtitle': ('Helvetica-Bold', 16, _C_GRAY_600),
+    'InfoLabel': ('Helvetica-Bold', 11, _C_GRAY_700),
+    'InfoText': ('Helvetica', 11, _C_GRAY_700),
+    'LocationValue': ('Helvetica', 11, _C_GRAY_500),
+    'TableHeader': ('Helvetica-Bold', 12, colors.whitesmoke),
+    'TableCell': ('Helvetica', 10, colors.black),
+    'Footer': ('Helvetica-Oblique', 9, _C_GRAY_400),
+    'Note': ('Helvetica-Oblique', 10, colors.black),
+}
+
+# Severity label -> text color; labels not listed use the default cell color
+_SEVERITY_MARKUP = {
+    'High': _C_RED,
+    'Medium': _C_AMBER,
+    'Low': _C_GREEN,
+}
+
+
+class _TemplateCanvas(Canvas):
+    """
+    Canvas that stamps the fixed page decoration on every page.
+    
+    The header band and footer rule are recorded once per document as a
+    PDF form XObject and referenced from each page, so multi-page reports
+    do not redraw them.
+    """
+    
+    def __init__(self, *args, accent=None, rule=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._accent = accent
+        self._rule = rule
+        self._template_ready = False
+    
+    def draw_template(self):
+        """Draw the page decoration on the current page."""
+        if not self._template_ready:
+            self.beginForm('page_template')
+            self.setFillColor(self._accent)
+            self.rect(0, PAGE_HEIGHT - 12, PAGE_WIDTH, 12, stroke=0, fill=1)
+            self.setStrokeColor(self._rule)
+            self.setLineWidth(0.5)
+            self.line(MARGIN, BOTTOM - 24, PAGE_WIDTH - MARGIN, BOTTOM - 24)
+            self.endForm()
+            self._template_ready = True
+        self.doForm('page_template')
+    
+    def new_page(self):
+        """Finish the current page and start a decorated one; returns the new top y."""
+        self.showPage()
+        self.draw_template()
+        return TOP
+
 
 class PotholeReportGenerator:
     """Generate PDF reports for pothole detections"""
     
+    # Serializes report writes so concurrent requests never pick the same
+    # file name; shared by every instance in the process
+    _build_lock = threading.Lock()
+    
     def __init__(self, output_dir='reports'):
         """Initialize the report generator"""
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
-        self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self._setup_table_layout()
+        # Canvas arguments shared by every report
+        self._canvas_kwargs = dict(pagesize=letter, accent=self.accent_color, rule=self.grid_color)
     
     def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#6366f1'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Subtitle style
-        self.styles.add(ParagraphStyle(
-            name='CustomSubtitle',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#4b5563'),
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Info style
-        self.styles.add(ParagraphStyle(
-            name='InfoText',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            textColor=colors.HexColor('#374151'),
-            spaceAfter=6
-        ))
+        """Setup text styles as (font, size, color) and table colors"""
+        self.styles = _TEXT_STYLES
+        self.accent_color = _C_INDIGO
+        self.row_colors = (colors.white, _C_GRAY_50)
+        self.grid_color = colors.grey
+    
+    def _setup_table_layout(self):
+        """Precompute detection table geometry reused for every row"""
+        self._table_width = sum(DETECTION_COL_WIDTHS)
+        col_lefts = [MARGIN]
+        for width in DETECTION_COL_WIDTHS[:-1]:
+            col_lefts.append(col_lefts[-1] + width)
+        # Inner vertical rulings and text centre of each column
+        self._col_rulings = tuple(col_lefts[1:])
+        self._col_centres = tuple(left + width / 2 for left, width in zip(col_lefts, DETECTION_COL_WIDTHS))
+        # Width of the map link hotspot
+        self._map_link_width = stringWidth(MAP_LINK_TEXT, *self.styles['LocationValue'][:2])
+    
+    def _set_style(self, canvas, name):
+        """Apply a text style to the canvas"""
+        font, size, color = self.styles[name]
+        canvas.setFont(font, size)
+        canvas.setFillColor(color)
+    
+    def _draw_subtitle(self, canvas, y, text):
+        """Draw a section heading; returns the y below it"""
+        self._set_style(canvas, 'CustomSubtitle')
+        canvas.drawString(MARGIN, y - 16, text)
+        return y - 16 - 12
+    
+    def _draw_detection_header(self, canvas, y):
+        """Draw the detection table header row; returns the y below it"""
+        canvas.setFillColor(self.accent_color)
+        canvas.setStrokeColor(self.grid_color)
+        canvas.setLineWidth(1)
+        canvas.rect(MARGIN, y - DETECTION_HEADER_HEIGHT, self._table_width, DETECTION_HEADER_HEIGHT,
+                    stroke=1, fill=1)
+        
+        self._set_style(canvas, 'TableHeader')
+        for header, centre in zip(DETECTION_HEADERS, self._col_centres):
+            canvas.drawCentredString(centre, y - 16, header)
+        return y - DETECTION_HEADER_HEIGHT
+    
+    def _draw_detection_block(self, canvas, y, rows):
+        """
+        Draw a header plus a page's worth of detection rows; returns the y below it
+        
+        Each block is drawn in a few passes (stripes per color, the whole
+        grid as one path, then the text) instead of switching graphics
+        state for every row.
+        """
+        y = self._draw_detection_header(canvas, y)
+        bottom = y - len(rows) * DETECTION_ROW_HEIGHT
+        
+        # Row stripes, one fill color at a time
+        for parity, fill in enumerate(self.row_colors):
+            canvas.setFillColor(fill)
+            for r, (idx, _, _) in enumerate(rows):
+                if (idx - 1) % 2 == parity:
+                    canvas.rect(MARGIN, y - (r + 1) * DETECTION_ROW_HEIGHT, self._table_width,
+                                DETECTION_ROW_HEIGHT, stroke=0, fill=1)
+        
+        # Grid as a single path
+        grid = canvas.beginPath()
+        for r in range(len(rows) + 1):
+            row_y = y - r * DETECTION_ROW_HEIGHT
+            grid.moveTo(MARGIN, row_y)
+            grid.lineTo(MARGIN + self._table_width, row_y)
+        for x in (MARGIN, *self._col_rulings, MARGIN + self._table_width):
+            grid.moveTo(x, y)
+            grid.lineTo(x, bottom)
+        canvas.setStrokeColor(self.grid_color)
+        canvas.setLineWidth(1)
+        canvas.drawPath(grid, stroke=1, fill=0)
+        
+        # Cell text in the default color, except colored severity cells
+        self._set_style(canvas, 'TableCell')
+        severity_centre = self._col_centres[1]
+        by_color = {}
+        for r, (_, cells, severity_color) in enumerate(rows):
+            text_y = y - r * DETECTION_ROW_HEIGHT - 13
+            for col, (text, centre) in enumerate(zip(cells, self._col_centres)):
+                if col == 1 and severity_color is not None:
+                    by_color.setdefault(severity_color, []).append((text_y, text))
+                else:
+                    canvas.drawCentredString(centre, text_y, text)
+        
+        # Severity cells, one fill color change per severity level
+        for severity_color, cells in by_color.items():
+            canvas.setFillColor(severity_color)
+            for text_y, text in cells:
+                canvas.drawCentredString(severity_centre, text_y, text)
+        
+        return bottom
+    
+    def flush(self):
+        """
+        Make finished reports durable by fsyncing the output directory
+        
+        Reports are renamed into place without a per-file fsync; call this
+        periodically (or at shutdown) to persist the directory entries in
+        one barrier instead of one per report. A no-op before the first
+        report creates the directory, and on Windows, where directories
+        cannot be opened for fsync.
+        """
+        if os.name == 'nt' or not self.output_dir.exists():
+            return
+        fd = os.open(self.output_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def _new_report_path(self):
+        """Unique path for a new report (call with _build_lock held)"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filepath = self.output_dir / f'pothole_report_{timestamp}.pdf'
+        # Several reports within the same second get a numeric suffix
+        n = 1
+        while filepath.exists():
+            filepath = self.output_dir / f'pothole_report_{timestamp}_{n}.pdf'
+            n += 1
+        return filepath
+    
+    def _ensure_output_dir(self):
+        """Create the output directory on first write (a stat once it exists)"""
+        if not self.output_dir.exists():
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _write_atomic(self, filepath, write):
+        """
+        Call write(stream) on a buffered temp file, then rename it to filepath
+        
+        Small writes are coalesced by a 1 MiB buffer, and the atomic rename
+        means readers never see a half-written PDF.
+        """
+        self._ensure_output_dir()
+        tmp_path = filepath.with_suffix('.pdf.tmp')
+        try:
+            with open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as stream:
+                write(stream)
+            os.replace(tmp_path, filepath)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
+    def _render_pdf(self, stream, detections, location, image_path, **part):
+        """Render a report (or one part of it) as PDF into stream"""
+        canvas = _TemplateCanvas(stream, **self._canvas_kwargs)
+        self._draw_report(canvas, detections, location, image_path, **part)
+        canvas.save()
     
     def generate_report(self, detections, location=None, image_path=None):
         """
         Generate a PDF report for pothole detections
         
+        The PDF is drawn directly with the low-level canvas API at fixed
+        coordinates, so cost grows with the bytes written rather than with
+        flowable layout passes.
+        
         Args:
             detections: List of detection dictionaries with bbox, confidence, severity
             location: Dictionary with 'latitude', 'longitude', 'accuracy'
@@ -67,145 +297,275 @@ class PotholeReportGenerator:
         Returns:
             str: Path to generated PDF file
         """
-        # Generate unique filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'pothole_report_{timestamp}.pdf'
-        filepath = self.output_dir / filename
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            str(filepath),
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
-        
-        # Build content
-        story = []
+        with self._build_lock:
+            filepath = self._new_report_path()
+            self._write_atomic(
+                filepath,
+                lambda stream: self._render_pdf(stream, detections, location, image_path)
+            )
+        return str(filepath)
+    
+    def generate_report_parallel(self, detections, location=None, image_path=None, max_workers=None):
+        """
+        Generate a PDF report, rendering the detection table in parallel parts
+        
+        Detections are split into page-aligned chunks, each rendered to its
+        own PDF by a worker process, and the parts are merged with pypdf.
+        The title, metadata and location go in the first part; the image
+        and footer in the last. Small reports are rendered serially, since
+        process startup would outweigh the layout work.
+        
+        Args:
+            detections: List of detection dictionaries with bbox, confidence, severity
+            location: Dictionary with 'latitude', 'longitude', 'accuracy'
+            image_path: Path to the detection image (optional)
+            max_workers: Number of worker processes (default: CPU count)
+        
+        Returns:
+            str: Path to generated PDF file
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        if max_workers < 2 or len(detections) < PARALLEL_MIN_ROWS:
+            return self.generate_report(detections, location, image_path)
+        
+        from pypdf import PdfWriter
         
+        # Page-aligned chunks so parts do not end with half-empty pages: the
+        # first part fills the rest of the intro page plus whole pages, the
+        # others whole pages only
+        target = -(-len(detections) // max_workers)
+        first_page_rows = self._intro_page_rows(len(detections), location)
+        first_size = first_page_rows + max(0, -(-(target - first_page_rows) // ROWS_PER_PAGE)) * ROWS_PER_PAGE
+        chunk_size = -(-target // ROWS_PER_PAGE) * ROWS_PER_PAGE
+        bounds = [0, *range(first_size, len(detections), chunk_size), len(detections)]
+        
+        with self._build_lock:
+            self._ensure_output_dir()
+            filepath = self._new_report_path()
+            tasks = []
+            for part_idx, (start, end) in enumerate(zip(bounds, bounds[1:])):
+                part = dict(
+                    total=len(detections),
+                    start_index=start + 1,
+                    intro=start == 0,
+                    outro=end == len(detections)
+                )
+                part_path = filepath.with_suffix(f'.part{part_idx}.pdf')
+                tasks.append((str(part_path), detections[start:end], location, image_path, part))
+            
+            try:
+                with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)),
+                                         initializer=_init_worker,
+                                         initargs=(str(self.output_dir),)) as executor:
+                    part_paths = list(executor.map(_render_part, tasks))
+                
+                writer = PdfWriter()
+                for part_path in part_paths:
+                    writer.append(part_path)
+                self._write_atomic(filepath, writer.write)
+            finally:
+                for task in tasks:
+                    Path(task[0]).unlink(missing_ok=True)
+        
+        return str(filepath)
+    
+    def _intro_page_rows(self, total, location):
+        """Detection rows that fit on the page where the table starts, below the intro"""
+        # Lay the intro out on a scratch canvas to find where the table begins
+        canvas = _TemplateCanvas(BytesIO(), **self._canvas_kwargs)
+        y = self._draw_intro(canvas, TOP, total, location)
+        if y - 28 - DETECTION_HEADER_HEIGHT - DETECTION_ROW_HEIGHT < BOTTOM:
+            y = TOP  # The table title moves to the next page
+        y = self._draw_subtitle(canvas, y, "Detection Details")
+        return max(1, int((y - DETECTION_HEADER_HEIGHT - BOTTOM) // DETECTION_ROW_HEIGHT))
+    
+    def _draw_report(self, canvas, detections, location, image_path,
+                     total=None, start_index=1, intro=True, outro=True):
+        """
+        Draw the report onto a fresh canvas
+        
+        For parallel rendering a part may skip the intro (title, metadata,
+        location) or the outro (image, footer); rows are numbered from
+        start_index and total is the detection count of the whole report.
+        """
+        canvas.draw_template()
+        y = TOP
+        
+        if intro:
+            y = self._draw_intro(canvas, y, len(detections) if total is None else total, location)
+        
+        if detections:
+            y = self._draw_detections(canvas, y, detections, start_index, with_title=intro)
+        
+        if outro:
+            self._draw_outro(canvas, y, image_path)
+        
+        canvas.showPage()
+    
+    def _draw_intro(self, canvas, y, total, location):
+        """Draw title, metadata and location; returns the y below them"""
         # Title
-        story.append(Paragraph("Pothole Detection Report", self.styles['CustomTitle']))
-        story.append(Spacer(1, 12))
+        self._set_style(canvas, 'CustomTitle')
+        canvas.drawCentredString(PAGE_WIDTH / 2, y - 24, "Pothole Detection Report")
+        y -= 24 + 30 + 12
         
         # Report metadata
-        story.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", 
-                              self.styles['InfoText']))
-        story.append(Paragraph(f"<b>Total Potholes Detected:</b> {len(detections)}", 
-                              self.styles['InfoText']))
-        story.append(Spacer(1, 20))
+        metadata = [
+            ('Generated: ', datetime.now().strftime('%B %d, %Y at %I:%M %p')),
+            ('Total Potholes Detected: ', str(total)),
+        ]
+        for label, value in metadata:
+            self._set_style(canvas, 'InfoLabel')
+            canvas.drawString(MARGIN, y - 11, label)
+            label_width = canvas.stringWidth(label, *self.styles['InfoLabel'][:2])
+            self._set_style(canvas, 'InfoText')
+            canvas.drawString(MARGIN + label_width, y - 11, value)
+            y -= 11 + 6 + 4
+        y -= 20
         
         # Location information
         if location:
-            story.append(Paragraph("Location Information", self.styles['CustomSubtitle']))
+            y = self._draw_subtitle(canvas, y, "Location Information")
             
             lat = location.get('latitude', 'N/A')
             lon = location.get('longitude', 'N/A')
             accuracy = location.get('accuracy', 'N/A')
             
             location_data = [
-                ['Latitude:', f"{lat}°"],
-                ['Longitude:', f"{lon}°"],
-                ['Accuracy:', f"±{accuracy}m" if accuracy != 'N/A' else 'N/A'],
-                ['Google Maps:', f'<link href="https://www.google.com/maps?q={lat},{lon}">View on Map</link>']
+                ('Latitude:', f"{lat}°"),
+                ('Longitude:', f"{lon}°"),
+                ('Accuracy:', f"±{accuracy}m" if accuracy != 'N/A' else 'N/A'),
             ]
             
-            location_table = Table(location_data, colWidths=[2*inch, 4*inch])
-            location_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 11),
-                ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#374151')),
-                ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#6b7280')),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ]))
+            for label, value in location_data:
+                self._set_style(canvas, 'InfoLabel')
+                canvas.drawString(MARGIN, y - 11, label)
+                self._set_style(canvas, 'LocationValue')
+                canvas.drawString(MARGIN + 2 * inch, y - 11, value)
+                y -= 11 + 8 + 4
             
-            story.append(location_table)
-            story.append(Spacer(1, 20))
+            # Google Maps link as a clickable hotspot over the text (only
+            # when both coordinates are known)
+            if lat != 'N/A' and lon != 'N/A':
+                self._set_style(canvas, 'InfoLabel')
+                canvas.drawString(MARGIN, y - 11, 'Google Maps:')
+                self._set_style(canvas, 'LocationValue')
+                canvas.drawString(MARGIN + 2 * inch, y - 11, MAP_LINK_TEXT)
+                canvas.linkURL(
+                    f'https://www.google.com/maps?q={lat},{lon}',
+                    (MARGIN + 2 * inch, y - 14, MARGIN + 2 * inch + self._map_link_width, y),
+                    relative=0
+                )
+                y -= 11 + 8 + 4
+            y -= 20
         
-        # Detection details
-        if detections:
-            story.append(Paragraph("Detection Details", self.styles['CustomSubtitle']))
-            
-            # Create table data
-            table_data = [['#', 'Severity', 'Confidence', 'Depth Score']]
-            
-            for idx, detection in enumerate(detections, 1):
-                severity = detection.get('severity', 'Unknown')
-                confidence = detection.get('confidence', 0) * 100
-                depth_score = detection.get('depth_score', 0)
-                
-                # Color code severity
-                if severity == 'High':
-                    severity_text = f'<font color="#ef4444">🔴 {severity}</font>'
-                elif severity == 'Medium':
-                    severity_text = f'<font color="#f59e0b">🟡 {severity}</font>'
-                elif severity == 'Low':
-                    severity_text = f'<font color="#10b981">🟢 {severity}</font>'
-                else:
-                    severity_text = f'⚪ {severity}'
-                
-                table_data.append([
-                    str(idx),
-                    Paragraph(severity_text, self.styles['Normal']),
-                    f'{confidence:.1f}%',
-                    f'{depth_score:.3f}' if depth_score else 'N/A'
-                ])
-            
-            detection_table = Table(table_data, colWidths=[0.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-            detection_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6366f1')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
-            ]))
-            
-            story.append(detection_table)
-            story.append(Spacer(1, 20))
+        return y
+    
+    def _draw_detections(self, canvas, y, detections, start_index=1, with_title=True):
+        """Draw the detection table, continuing across pages; returns the y below it"""
+        if with_title:
+            if y - 28 - DETECTION_HEADER_HEIGHT - DETECTION_ROW_HEIGHT < BOTTOM:
+                y = canvas.new_page()
+            y = self._draw_subtitle(canvas, y, "Detection Details")
+        
+        rows = self._detection_rows(detections, start_index)
+        
+        # Draw the table in page-sized blocks, repeating the header on
+        # each continuation page
+        pos = 0
+        while pos < len(rows):
+            fit = int((y - DETECTION_HEADER_HEIGHT - BOTTOM) // DETECTION_ROW_HEIGHT)
+            if fit < 1:
+                y = canvas.new_page()
+                continue
+            block = rows[pos:pos + fit]
+            y = self._draw_detection_block(canvas, y, block)
+            pos += len(block)
+            if pos < len(rows):
+                y = canvas.new_page()
+        
+        return y - 20
+    
+    def _detection_rows(self, detections, start_index=1):
+        """Table rows as (idx, cells, severity_color) for a list of detections"""
+        confidence = [f"{d.get('confidence', 0) * 100:.1f}%" for d in detections]
+        depth = [f"{d['depth_score']:.3f}" if d.get('depth_score') else 'N/A' for d in detections]
+        
+        # Severity is plain text colored by level through the lookup table
+        # (the emoji markers have no glyphs in the built-in PDF fonts)
+        severities = [str(d.get('severity', 'Unknown')) for d in detections]
+        lookup = _SEVERITY_MARKUP.get
+        return [
+            (idx, (str(idx), severity, conf, dep), lookup(severity))
+            for idx, severity, conf, dep in zip(range(start_index, start_index + len(detections)),
+                                                severities, confidence, depth)
+        ]
+    
+    @staticmethod
+    def _thumbnail(image_path):
+        """
+        Downscale the detection image to its drawn size before embedding.
         
+        Args:
+            image_path: Path to the detection image
+            
+        Returns:
+            ImageReader: JPEG thumbnail of at most IMAGE_THUMB_SIZE pixels
+        """
+        return ImageReader(BytesIO(_thumb_bytes(str(image_path), os.path.getmtime(image_path))))
+    
+    def _draw_outro(self, canvas, y, image_path):
+        """Draw the detection image and footer"""
         # Add image if provided
         if image_path and Path(image_path).exists():
-            story.append(Paragraph("Detection Image", self.styles['CustomSubtitle']))
+            if y - 28 - IMAGE_HEIGHT < BOTTOM:
+                y = canvas.new_page()
+            y = self._draw_subtitle(canvas, y, "Detection Image")
             try:
-                img = Image(str(image_path), width=5*inch, height=3.75*inch)
-                story.append(img)
+                canvas.drawImage(self._thumbnail(image_path), MARGIN + (PAGE_WIDTH - 2 * MARGIN - IMAGE_WIDTH) / 2,
+                                 y - IMAGE_HEIGHT, width=IMAGE_WIDTH, height=IMAGE_HEIGHT)
+                y -= IMAGE_HEIGHT
             except Exception as e:
-                story.append(Paragraph(f"<i>Image could not be loaded: {e}</i>", 
-                                     self.styles['Normal']))
+                self._set_style(canvas, 'Note')
+                canvas.drawString(MARGIN, y - 10, f"Image could not be loaded: {e}")
+                y -= 10 + 6
         
         # Footer
-        story.append(Spacer(1, 30))
-        story.append(Paragraph(
-            '<i>Generated by AI-Powered Pothole Detection System | YOLOv8 + MiDaS</i>',
-            ParagraphStyle(
-                'Footer',
-                parent=self.styles['Normal'],
-                fontSize=9,
-                textColor=colors.HexColor('#9ca3af'),
-                alignment=TA_CENTER
-            )
-        ))
-        
-        # Build PDF
-        doc.build(story)
-        
-        return str(filepath)
+        if y - 30 - 9 < BOTTOM:
+            y = canvas.new_page()
+        self._set_style(canvas, 'Footer')
+        canvas.drawCentredString(PAGE_WIDTH / 2, y - 30 - 9, FOOTER_TEXT)
+
+# Per-process generator used by parallel rendering workers
+_worker_generator = None
 
-# Singleton instance
-_report_generator = None
+def _init_worker(output_dir):
+    """Construct the report generator once per worker process"""
+    global _worker_generator
+    _worker_generator = PotholeReportGenerator(output_dir)
+
+def _render_part(task):
+    """Render one part of a parallel report to its own PDF; returns its path"""
+    part_path, detections, location, image_path, part = task
+    with open(part_path, 'wb', buffering=WRITE_BUFFER_SIZE) as stream:
+        _worker_generator._render_pdf(stream, detections, location, image_path, **part)
+    return part_path
+
+@functools.lru_cache(maxsize=128)
+def _thumb_bytes(path, mtime):
+    """
+    JPEG bytes of the report thumbnail for an image, cached per file version
+    
+    mtime is part of the cache key only, so a rewritten image is decoded
+    again while repeat reports for the same image reuse the thumbnail.
+    """
+    with Image.open(path) as img:
+        img.thumbnail(IMAGE_THUMB_SIZE, Image.LANCZOS)
+        buf = BytesIO()
+        img.convert('RGB').save(buf, format='JPEG', quality=IMAGE_JPEG_QUALITY)
+    return buf.getvalue()
 
+@functools.lru_cache(maxsize=None)
 def get_report_generator():
     """Get or create the report generator singleton"""
-    global _report_generator
-    if _report_generator is None:
-        _report_generator = PotholeReportGenerator()
-    return _report_generator
+    return PotholeReportGenerator()
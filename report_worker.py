@@ -0,0 +1,139 @@
+"""
+Persistent subprocess for PDF report generation.
+
+The worker is forked once at startup, imports ReportLab and builds the
+report generator a single time, then serves report requests from a
+queue, so no /generate_report request pays that import and setup cost.
+"""
+
+import itertools
+import multiprocessing
+import signal
+import threading
+
+# How long a request waits for its report before giving up (seconds)
+REPORT_TIMEOUT = 120
+
+
+def _serve(requests, responses):
+    """Worker process loop: build reports until a None sentinel arrives."""
+    # Ctrl+C signals the whole process group; leave shutdown to the
+    # parent, whose atexit stop() sends the sentinel
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from report_generator import get_report_generator
+    generator = get_report_generator()
+    for task_id, detections, location, image_path in iter(requests.get, None):
+        try:
+            report_path = generator.generate_report(detections, location, image_path)
+            responses.put((task_id, report_path, None))
+        except Exception as e:
+            # Send the message only; arbitrary exceptions may not pickle
+            responses.put((task_id, None, f"{type(e).__name__}: {e}"))
+        # Make the reports durable once per burst of requests, after the
+        # queue drains, rather than once per report
+        if requests.empty():
+            _flush(generator)
+    _flush(generator)
+
+
+def _flush(generator):
+    """Flush the reports directory, warning instead of failing."""
+    try:
+        generator.flush()
+    except OSError as e:
+        print(f"Warning: Could not flush reports directory: {e}")
+
+
+class _ReportRequest:
+    """A queued report and the slot its result is written back to."""
+    
+    __slots__ = ('event', 'path', 'error')
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.path = None
+        self.error = None
+
+
+class ReportWorker:
+    """Generates reports in a long-lived child process."""
+    
+    def __init__(self, timeout=REPORT_TIMEOUT):
+        """
+        Initialize the report worker.
+        
+        Args:
+            timeout: Seconds to wait for a report before raising
+        """
+        self.timeout = timeout
+        # Fork, so the child starts from the parent's already-imported
+        # modules; start() must run before CUDA or other threads start
+        ctx = multiprocessing.get_context('fork')
+        self._requests = ctx.Queue()
+        self._responses = ctx.Queue()
+        self._process = ctx.Process(
+            target=_serve, args=(self._requests, self._responses),
+            name='report-worker', daemon=True
+        )
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._dispatcher = None
+    
+    def start(self):
+        """Fork the worker process and start the response dispatcher."""
+        self._process.start()
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name='report-dispatch', daemon=True
+        )
+        self._dispatcher.start()
+    
+    def stop(self):
+        """Ask the worker to flush and exit, waiting briefly for it."""
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(timeout=5)
+    
+    def is_alive(self):
+        """True while the worker process is running."""
+        return self._process.is_alive()
+    
+    def generate_report(self, detections, location=None, image_path=None):
+        """
+        Generate a PDF report in the worker process and wait for it.
+        
+        Args:
+            detections: List of detection dictionaries with bbox, confidence, severity
+            location: Dictionary with 'latitude', 'longitude', 'accuracy'
+            image_path: Path to the detection image (optional)
+        
+        Returns:
+            str: Path to generated PDF file
+        """
+        if not self.is_alive():
+            raise RuntimeError("Report worker is not running")
+        
+        task_id = next(self._ids)
+        request = _ReportRequest()
+        with self._lock:
+            self._pending[task_id] = request
+        self._requests.put((task_id, detections, location, image_path))
+        
+        if not request.event.wait(self.timeout):
+            with self._lock:
+                self._pending.pop(task_id, None)
+            raise RuntimeError(f"Report generation timed out after {self.timeout}s")
+        if request.error is not None:
+            raise RuntimeError(request.error)
+        return request.path
+    
+    def _dispatch(self):
+        """Hand each worker response to the request waiting for it."""
+        while True:
+            task_id, path, error = self._responses.get()
+            with self._lock:
+                request = self._pending.pop(task_id, None)
+            if request is not None:
+                request.path = path
+                request.error = error
+                request.event.set()
@@ -143,16 +143,16 @@ function startDetectionLoop() {
             const ctx = canvas.getContext('2d');
             ctx.drawImage(videoFeed, 0, 0);
 
-            // Convert to base64
-            const frameData = canvas.toDataURL('image/jpeg', 0.8);
+            // Encode as JPEG (sent as raw bytes, no base64)
+            const frameBlob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
 
             // Send to backend for detection
             const response = await fetch('/detect_frame', {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'image/jpeg'
                 },
-                body: JSON.stringify({ frame: frameData })
+                body: frameBlob
             });
 
             const data = await response.json();
@@ -318,7 +318,9 @@ analyzeBtn.addEventListener('click', async () => {
 
             // Show images
             originalImage.src = previewImage.src;
-            resultImage.src = data.result_image;
+            resultImage.src = data.result_image_b64
+                ? `data:image/jpeg;base64,${data.result_image_b64}`
+                : data.result_image;
 
             // Display severity information if available
             const severitySection = document.getElementById('severitySection');
@@ -2,79 +2,252 @@
 Train YOLOv8 model for pothole detection.
 """
 
+import argparse
 from ultralytics import YOLO
+import torch
 import os
 from pathlib import Path
 
-def train_model():
-    """Train YOLOv8 model on pothole dataset."""
+BEST_WEIGHTS = Path('runs/detect/pothole_detector/weights/best.pt')
+
+def export_model(weights_path, yaml_path):
+    """
+    Export trained weights for fast inference.
     
-    print("=" * 60)
-    print("YOLOv8 Pothole Detection Training")
-    print("=" * 60)
+    Writes an ONNX model and, when a CUDA GPU is available, an INT8
+    TensorRT engine calibrated on the dataset, both next to the weights.
+    
+    Args:
+        weights_path: Path to the trained .pt weights
+        yaml_path: Dataset YAML used for INT8 calibration
+    
+    Returns:
+        list: Paths of the exported files
+    """
+    model = YOLO(str(weights_path))
+    exported = []
+    
+    print("\n⚙️ Exporting ONNX model...")
+    exported.append(model.export(format='onnx', dynamic=True, simplify=True, opset=17))
+    print(f"✓ ONNX model saved to: {exported[-1]}")
+    
+    if torch.cuda.is_available():
+        # Dynamic batch up to 16 so app.py's frame batcher can use the engine
+        print("\n⚙️ Exporting TensorRT INT8 engine (calibrating on the dataset)...")
+        exported.append(model.export(format='engine', half=True, int8=True, data=str(yaml_path),
+                                     dynamic=True, batch=16, imgsz=640))
+        print(f"✓ TensorRT engine saved to: {exported[-1]}")
+    else:
+        print("ℹ️ No CUDA GPU found, skipping TensorRT export")
+    
+    return exported
+
+def find_dataset_yaml(root):
+    """
+    Locate the dataset YAML without walking the whole image tree.
+    
+    Checks root/data.yaml, then one and two directory levels, and only
+    falls back to a recursive search if those find nothing.
     
+    Args:
+        root: Dataset directory
+    
+    Returns:
+        Path: Dataset YAML, or None if there is none
+    """
+    candidate = root / 'data.yaml'
+    if candidate.is_file():
+        return candidate
+    for pattern in ('*.yaml', '*/*.yaml'):
+        candidate = next(root.glob(pattern), None)
+        if candidate is not None:
+            return candidate
+    return next(root.rglob('*.yaml'), None)
+
+def weights_up_to_date(yaml_path):
+    """
+    Check whether the trained weights are newer than the dataset config.
+    
+    Args:
+        yaml_path: Dataset YAML the weights were trained on
+    
+    Returns:
+        bool: True if best.pt exists and was written after the YAML
+    """
+    return BEST_WEIGHTS.exists() and BEST_WEIGHTS.stat().st_mtime > yaml_path.stat().st_mtime
+
+def validate_model(model, yaml_path):
+    """
+    Validate a model on the dataset and print its mAP.
+    
+    Args:
+        model: YOLO model to validate
+        yaml_path: Dataset YAML
+    
+    Returns:
+        Validation metrics
+    """
+    print("\n📊 Running validation...")
+    metrics = model.val(data=str(yaml_path))
+    
+    print(f"\nValidation Results:")
+    print(f"  mAP50: {metrics.box.map50:.3f}")
+    print(f"  mAP50-95: {metrics.box.map:.3f}")
+    return metrics
+
+def locate_dataset_yaml():
+    """
+    Find the dataset YAML, printing guidance if it is missing.
+    
+    Returns:
+        Path: Dataset YAML, or None if the dataset is not prepared
+    """
     # Check if dataset exists
     yolo_dataset_dir = Path('yolo_dataset')
     data_dir = Path('data')
     
     if not yolo_dataset_dir.exists() and not data_dir.exists():
         print("❌ Dataset not found! Please run download_dataset.py first.")
-        return
+        return None
     
     # Find the YAML config file
-    yaml_files = list(yolo_dataset_dir.rglob('*.yaml')) if yolo_dataset_dir.exists() else list(data_dir.rglob('*.yaml'))
+    yaml_path = find_dataset_yaml(yolo_dataset_dir if yolo_dataset_dir.exists() else data_dir)
     
-    if not yaml_files:
+    if yaml_path is None:
         print("❌ No YAML config file found!")
         print("Please run convert_dataset.py to convert the dataset to YOLO format.")
-        return
+        return None
     
-    yaml_path = yaml_files[0]
     print(f"✓ Found config: {yaml_path}")
+    return yaml_path
+
+def validate_only(weights=BEST_WEIGHTS):
+    """
+    Validate existing weights without training.
+    
+    Args:
+        weights: Path to the trained .pt weights
+    
+    Returns:
+        Validation metrics, or None if weights or dataset are missing
+    """
+    if not Path(weights).exists():
+        print(f"❌ Model not found at {weights}")
+        print("Please train the model first by running: python train.py")
+        return None
+    yaml_path = locate_dataset_yaml()
+    if yaml_path is None:
+        return None
+    return validate_model(YOLO(str(weights)), yaml_path)
+
+def export_only(weights=BEST_WEIGHTS):
+    """
+    Export existing weights to ONNX / TensorRT without training.
+    
+    Args:
+        weights: Path to the trained .pt weights
+    
+    Returns:
+        list: Paths of the exported files, or None if weights or dataset are missing
+    """
+    if not Path(weights).exists():
+        print(f"❌ Model not found at {weights}")
+        print("Please train the model first by running: python train.py")
+        return None
+    # The dataset is needed for TensorRT INT8 calibration
+    yaml_path = locate_dataset_yaml()
+    if yaml_path is None:
+        return None
+    return export_model(weights, yaml_path)
+
+def train_model(do_validate=True):
+    """
+    Train YOLOv8 model on pothole dataset.
+    
+    Args:
+        do_validate: Validate (and export) after training
+    """
+    
+    print("=" * 60)
+    print("YOLOv8 Pothole Detection Training")
+    print("=" * 60)
+    
+    yaml_path = locate_dataset_yaml()
+    if yaml_path is None:
+        return
+    
+    # Skip training when the weights are newer than the dataset config
+    if weights_up_to_date(yaml_path) and os.environ.get('FORCE_RETRAIN') != '1':
+        print(f"\n✓ {BEST_WEIGHTS} is newer than {yaml_path}, skipping training")
+        print("Set FORCE_RETRAIN=1 to train again.")
+        if do_validate:
+            validate_model(YOLO(str(BEST_WEIGHTS)), yaml_path)
+        return
     
     # Initialize YOLOv8 model
     print("\n📦 Loading YOLOv8 model...")
     model = YOLO('yolov8n.pt')  # Use nano model for faster training
     
+    # Train on the first GPU when available; AMP only takes effect on CUDA
+    use_gpu = torch.cuda.is_available()
+    device = 0 if use_gpu else 'cpu'
+    # batch=-1 lets Ultralytics size the batch to GPU memory
+    batch = -1 if use_gpu else 16
+    workers = min(8, os.cpu_count() or 1)
+    
     # Training parameters
     print("\n🎯 Training configuration:")
     print(f"  Model: YOLOv8n (nano)")
     print(f"  Epochs: 50")
     print(f"  Image size: 640x640")
-    print(f"  Batch size: 16")
-    print(f"  Device: CPU (training will be slower)")
-    print(f"  Expected time: 30-60 minutes on CPU")
+    print(f"  Batch size: {'auto (fit to GPU memory)' if use_gpu else batch}")
+    print(f"  Dataloader workers: {workers} (images cached in RAM)")
+    if use_gpu:
+        print(f"  Device: GPU ({torch.cuda.get_device_name(0)}, mixed precision)")
+        print(f"  Expected time: a few minutes on GPU")
+    else:
+        print(f"  Device: CPU (training will be slower)")
+        print(f"  Expected time: 30-60 minutes on CPU")
     
     # Train the model
     print("\n🚀 Starting training...")
-    print("This may take 15-30 minutes depending on your hardware.\n")
+    print("This may take a while depending on your hardware.\n")
     
     try:
         results = model.train(
             data=str(yaml_path),
             epochs=50,
             imgsz=640,
-            batch=16,
+            batch=batch,
             name='pothole_detector',
+            exist_ok=True,  # Reuse the run directory so BEST_WEIGHTS is the latest run
             patience=10,  # Early stopping
             save=True,
             plots=True,
-            device='cpu'  # Use CPU (change to '0' if you have GPU)
+            device=device,
+            amp=True,  # Mixed precision on CUDA
+            cache='ram',  # Keep decoded images in memory across epochs
+            workers=workers
         )
         
         print("\n" + "=" * 60)
         print("✓ Training completed successfully!")
         print("=" * 60)
-        print(f"\nModel saved to: runs/detect/pothole_detector/weights/best.pt")
-        print(f"Training plots saved to: runs/detect/pothole_detector/")
-        
-        # Validate the model
-        print("\n📊 Running validation...")
-        metrics = model.val()
+        # The run just trained, wherever Ultralytics put it
+        best_weights = Path(model.trainer.best)
+        print(f"\nModel saved to: {best_weights}")
+        print(f"Training plots saved to: {best_weights.parent.parent}/")
         
-        print(f"\nValidation Results:")
-        print(f"  mAP50: {metrics.box.map50:.3f}")
-        print(f"  mAP50-95: {metrics.box.map:.3f}")
+        if do_validate:
+            # Validate the model
+            validate_model(model, yaml_path)
+            
+            # Export for deployment
+            try:
+                export_model(best_weights, yaml_path)
+            except Exception as e:
+                print(f"\n⚠️ Export failed: {e}")
+                print(f"The trained weights are still available at {best_weights}")
         
     except Exception as e:
         print(f"\n❌ Training failed: {e}")
@@ -83,5 +256,23 @@ def train_model():
         print("- Verify the YAML config file paths are correct")
         print("- Make sure you have enough disk space")
 
+def main():
+    parser = argparse.ArgumentParser(description='Train, validate or export the pothole detector')
+    parser.add_argument('--mode', choices=('train', 'val', 'export'), default='train',
+                        help='train (then validate and export), val only, or export only')
+    parser.add_argument('--weights', type=str, default=str(BEST_WEIGHTS),
+                        help='Trained weights for --mode val/export')
+    parser.add_argument('--no-val', action='store_true',
+                        help='Skip validation and export after training')
+    
+    args = parser.parse_args()
+    
+    if args.mode == 'val':
+        validate_only(args.weights)
+    elif args.mode == 'export':
+        export_only(args.weights)
+    else:
+        train_model(do_validate=not args.no_val)
+
 if __name__ == "__main__":
-    train_model()
+    main()